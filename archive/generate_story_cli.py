@@ -23,6 +23,8 @@ def load_model(device: torch.device = torch.device('cpu')):
     model = GPT2LMHeadModel.from_pretrained(model_name)
     model.eval()
     model.to(device)
+    model.config.use_cache = True
+    model.generation_config.use_cache = True
     return model, tokenizer
 
 
@@ -52,6 +54,7 @@ def generate_story(
             top_p=top_p,
             num_return_sequences=num_return_sequences,
             pad_token_id=tokenizer.eos_token_id,
+            use_cache=True,
         )
         if attention_mask is not None:
             gen_kwargs['attention_mask'] = attention_mask
@@ -7,78 +7,320 @@ from the command line (or interactively), and generates a short story using
 sampling (top-k and top-p / nucleus sampling).
 
 Usage examples (PowerShell):
-  python .\generate_story.py --prompt "A lonely astronaut lands on" --max_length 200 --top_k 50 --top_p 0.95
+  python .\generate_story.py --prompt "A lonely astronaut lands on" --max_new_tokens 200 --top_k 50 --top_p 0.95
 
 The script uses only free/open-source libraries: transformers and torch.
 """
 
 from typing import Optional, List
 import argparse
+import os
 import sys
 import textwrap
 
 import torch
-from transformers import GPT2LMHeadModel, GPT2TokenizerFast
+from transformers import GPT2LMHeadModel, GPT2TokenizerFast, LogitsProcessor, LogitsProcessorList
+from transformers.pytorch_utils import Conv1D
 
+QUANTIZE_CHOICES = ('int8', 'int4')
+# Route attention through torch's fused scaled_dot_product_attention
+# (FlashAttention / memory-efficient kernels where available)
+ATTN_IMPLEMENTATION = 'sdpa'
+# Directory written by scripts/export_onnx.py; used when USE_ORT=1
+ORT_MODEL_DIR = os.environ.get('ORT_MODEL_DIR', 'gpt2-ort')
 
-def load_model(device: torch.device = torch.device('cpu')):
+
+def select_dtype(device: torch.device) -> torch.dtype:
+    """Pick the weight dtype for the given device.
+
+    Half precision halves the bytes read per matmul on GPU, where GPT-2
+    decoding is memory-bandwidth bound. bf16 is preferred when the card
+    supports it since it keeps the fp32 exponent range. CPUs stay on fp32:
+    most lack native fp16/bf16 matmul kernels and would run slower.
+    """
+    if device.type == 'cuda':
+        if torch.cuda.is_bf16_supported():
+            return torch.bfloat16
+        return torch.float16
+    return torch.float32
+
+
+def _configure_cpu_threads() -> None:
+    """Run CPU inference with one intra-op thread per physical core.
+
+    PyTorch defaults to one thread per logical CPU; with SMT the sibling
+    threads compete for the same vector units and slow GPT-2's matmuls down.
+    """
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    if not cores:
+        # Assume two hardware threads per core
+        cores = max(1, (os.cpu_count() or 1) // 2)
+    torch.set_num_threads(cores)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Only settable once, before any inter-op parallel work has run
+    torch.backends.mkldnn.enabled = True
+
+
+def _conv1d_to_linear(model: torch.nn.Module) -> None:
+    """Replace GPT-2's Conv1D projections with equivalent nn.Linear layers.
+
+    GPT-2 keeps its attention/MLP weights in transformers' Conv1D (a Linear with
+    a transposed weight), which the torch and torchao quantizers skip.
+    """
+    targets = [
+        (parent, name, child)
+        for parent in model.modules()
+        for name, child in parent.named_children()
+        if isinstance(child, Conv1D)
+    ]
+    for parent, name, conv in targets:
+        in_features, out_features = conv.weight.shape
+        linear = torch.nn.Linear(
+            in_features, out_features, device=conv.weight.device, dtype=conv.weight.dtype
+        )
+        linear.weight.data = conv.weight.data.t().contiguous()
+        linear.bias.data = conv.bias.data
+        setattr(parent, name, linear)
+
+
+def _quantizable_linears(model: torch.nn.Module) -> set:
+    # lm_head shares its weight with the token embeddings; keep both in full
+    # precision so the output distribution is not degraded.
+    return {
+        name for name, module in model.named_modules()
+        if isinstance(module, torch.nn.Linear) and name != 'lm_head'
+    }
+
+
+def _from_pretrained(model_name: str, device: torch.device, quantize: Optional[str]) -> GPT2LMHeadModel:
+    """Load model weights onto `device`, optionally weight-only quantized."""
+    if quantize == 'int4' and device.type != 'cuda':
+        print('int4 quantization needs a CUDA device; loading unquantized weights instead')
+        quantize = None
+
+    if quantize == 'int8' and device.type == 'cuda':
+        # bitsandbytes LLM.int8(); quantized weights are placed on the GPU while
+        # loading and cannot be moved with .to() afterwards.
+        from transformers import BitsAndBytesConfig
+        return GPT2LMHeadModel.from_pretrained(
+            model_name,
+            quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+            torch_dtype=torch.float16,
+            device_map={'': device},
+            attn_implementation=ATTN_IMPLEMENTATION,
+        )
+
+    dtype = torch.bfloat16 if quantize == 'int4' else select_dtype(device)
+    model = GPT2LMHeadModel.from_pretrained(
+        model_name, torch_dtype=dtype, attn_implementation=ATTN_IMPLEMENTATION
+    )
+    model.to(device)
+    if quantize == 'int4':
+        from torchao.quantization import Int4WeightOnlyConfig, quantize_
+        _conv1d_to_linear(model)
+        keep = _quantizable_linears(model)
+        quantize_(model, Int4WeightOnlyConfig(), filter_fn=lambda module, fqn: fqn in keep)
+    elif quantize == 'int8':
+        # CPU: dynamic int8 quantization of the projection matmuls
+        _conv1d_to_linear(model)
+        model = torch.ao.quantization.quantize_dynamic(
+            model, _quantizable_linears(model), dtype=torch.qint8, inplace=True
+        )
+    return model
+
+
+def _load_ort_model(device: torch.device):
+    """Load the exported ONNX Runtime model; it exposes the same `generate` API."""
+    from optimum.onnxruntime import ORTModelForCausalLM
+    provider = 'CUDAExecutionProvider' if device.type == 'cuda' else 'CPUExecutionProvider'
+    return ORTModelForCausalLM.from_pretrained(ORT_MODEL_DIR, provider=provider, use_cache=True)
+
+
+def _warmup(model: GPT2LMHeadModel, tokenizer: GPT2TokenizerFast, device: torch.device) -> None:
+    """Run a tiny greedy generation so one-off setup cost is paid at load time."""
+    input_ids = torch.tensor([[tokenizer.eos_token_id]], device=device)
+    with torch.inference_mode():
+        model.generate(
+            input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            max_new_tokens=4,
+            do_sample=False,
+            pad_token_id=tokenizer.eos_token_id,
+        )
+
+
+def load_model(
+    device: torch.device = torch.device('cpu'),
+    quantize: Optional[str] = None,
+    compile_model: bool = False,
+    model_name: str = 'gpt2',
+):
     """Load the GPT-2 model and tokenizer.
 
+    Args:
+        device: device to place the model on
+        quantize: optional weight-only quantization, 'int8' or 'int4' (CUDA only)
+        compile_model: wrap the forward pass in torch.compile, with dynamic
+            shapes so the growing KV cache does not trigger recompiles
+        model_name: Hugging Face model id; GPT-2 small by default to keep
+            resource usage low
+
+    If the USE_ORT environment variable is set to 1, the ONNX Runtime model
+    exported by scripts/export_onnx.py is loaded from ORT_MODEL_DIR instead;
+    `quantize` and `compile_model` do not apply to it.
+
     Returns:
-        model: GPT2LMHeadModel in eval mode on the requested device
+        model: GPT2LMHeadModel in eval mode on the requested device (an
+            ORTModelForCausalLM when USE_ORT=1)
         tokenizer: GPT2TokenizerFast for encoding/decoding
     """
-    model_name = 'gpt2'  # GPT-2 small to keep resource usage low
+    if quantize not in (None,) + QUANTIZE_CHOICES:
+        raise ValueError(f'Unknown quantization {quantize!r}; expected one of {QUANTIZE_CHOICES}')
+    if device.type == 'cuda':
+        # Allow TF32 tensor cores for any matmuls still running in fp32
+        torch.backends.cuda.matmul.allow_tf32 = True
+    else:
+        _configure_cpu_threads()
     print(f"Loading model '{model_name}'... this may take a moment")
     tokenizer = GPT2TokenizerFast.from_pretrained(model_name)
-    model = GPT2LMHeadModel.from_pretrained(model_name)
-    model.eval()
-    model.to(device)
+    # GPT-2 has no pad token; pad batched prompts on the left with EOS so every
+    # row ends at its last prompt token and decoding continues from there.
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = 'left'
+    if os.environ.get('USE_ORT') == '1':
+        print(f"Using ONNX Runtime model from '{ORT_MODEL_DIR}'")
+        if quantize or compile_model:
+            print('Quantization and torch.compile are ignored for the ONNX Runtime model')
+        compile_model = False
+        model = _load_ort_model(device)
+    else:
+        model = _from_pretrained(model_name, device, quantize)
+        model.eval()
+        if device.type == 'cpu' and quantize is None:
+            try:
+                import intel_extension_for_pytorch as ipex
+            except ImportError:
+                pass
+            else:
+                # Optional: oneDNN weight prepacking and fused CPU kernels
+                model = ipex.optimize(model)
+    # Reuse past key/values between decoding steps instead of re-running
+    # attention over the whole prefix for every new token.
+    model.config.use_cache = True
+    model.generation_config.use_cache = True
+    if compile_model:
+        if hasattr(torch, 'compile'):
+            # Sequence length grows every decoding step, so compile with
+            # dynamic shapes up front rather than specializing on the first
+            # length seen. CUDA graphs (mode='reduce-overhead') are not used:
+            # they would record a separate graph for every cache length.
+            model.forward = torch.compile(model.forward, dynamic=True)
+            print('Compiling model... this only happens once')
+        else:
+            print('torch.compile needs PyTorch 2.0 or newer; running uncompiled')
+    # Pay for CUDA context/kernel setup (and compilation, if enabled) now
+    # rather than on the first prompt.
+    _warmup(model, tokenizer, device)
     return model, tokenizer
 
 
-def generate_story(
+def to_device(tensor: torch.Tensor, device: torch.device) -> torch.Tensor:
+    """Copy a CPU tensor to `device`; on CUDA go through pinned memory so the
+    host-to-device copy is asynchronous."""
+    if device.type == 'cuda':
+        return tensor.pin_memory().to(device, non_blocking=True)
+    return tensor.to(device)
+
+
+class FlashInferSampler(LogitsProcessor):
+    """Draw the next token with FlashInfer's fused top-k/top-p sampling kernel.
+
+    This replaces HF's top-k and top-p warpers, which each sort the full
+    50k-token vocabulary every step, with FlashInfer's sorting-free kernel.
+    The processor returns scores where only the sampled token is finite, so
+    generate() still runs its usual softmax and multinomial draw over the
+    vocabulary (which then always picks that token), and building those
+    scores adds a fill and a scatter over [batch, vocab]. Use it with
+    generate's temperature/top-k/top-p warpers disabled.
+    """
+
+    def __init__(self, temperature: float, top_k: int, top_p: float):
+        from flashinfer.sampling import top_k_top_p_sampling_from_logits
+        self._sample = top_k_top_p_sampling_from_logits
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        top_k = self.top_k if self.top_k > 0 else scores.shape[-1]
+        tokens = self._sample(scores / self.temperature, top_k, self.top_p)
+        sampled = torch.full_like(scores, float('-inf'))
+        sampled.scatter_(-1, tokens.long().unsqueeze(-1), 0.0)
+        return sampled
+
+
+def generate_stories(
     model: GPT2LMHeadModel,
     tokenizer: GPT2TokenizerFast,
-    prompt: str,
-    max_length: int = 200,
+    prompts: List[str],
+    max_new_tokens: int = 200,
     temperature: float = 1.0,
     top_k: int = 50,
     top_p: float = 0.95,
     num_return_sequences: int = 1,
     device: torch.device = torch.device('cpu'),
-) -> List[str]:
-    """Generate story continuations from a prompt.
+    fused_sampling: bool = False,
+) -> List[List[str]]:
+    """Generate story continuations for several prompts in one batched call.
 
-    Uses sampling with temperature, top-k, and top-p (nucleus) sampling for more
-    creative outputs. Returns a list of generated strings (one per sequence).
+    Prompts are left-padded into a single batch so one `generate` call decodes
+    all of them (and all `num_return_sequences` samples) together. Returns one
+    list of continuations per prompt, in the order the prompts were given.
+    With `fused_sampling` on a CUDA device, sampling uses FlashInferSampler
+    (requires the optional `flashinfer` package).
     """
-    # Encode prompt and obtain an attention mask to avoid model warnings
-    encoded = tokenizer(prompt, return_tensors='pt')
-    input_ids = encoded['input_ids'].to(device)
+    # Encode prompts and obtain an attention mask so padding is ignored
+    encoded = tokenizer(prompts, return_tensors='pt', padding=True)
+    input_ids = to_device(encoded['input_ids'], device)
     attention_mask = encoded.get('attention_mask')
     if attention_mask is not None:
-        attention_mask = attention_mask.to(device)
+        attention_mask = to_device(attention_mask, device)
 
     # Generate
-    with torch.no_grad():
+    with torch.inference_mode():
         gen_kwargs = dict(
             do_sample=True,
-            max_length=max_length,
+            max_new_tokens=max_new_tokens,
+            eos_token_id=tokenizer.eos_token_id,  # stop a sequence as soon as it ends
             temperature=temperature,
             top_k=top_k if top_k > 0 else None,
             top_p=top_p,
             num_return_sequences=num_return_sequences,
             pad_token_id=tokenizer.eos_token_id,
+            use_cache=True,
         )
         # include attention_mask if available
         if attention_mask is not None:
             gen_kwargs['attention_mask'] = attention_mask
+        if fused_sampling and device.type == 'cuda':
+            # The fused kernel applies temperature/top-k/top-p itself
+            gen_kwargs['logits_processor'] = LogitsProcessorList(
+                [FlashInferSampler(temperature, top_k, top_p)]
+            )
+            gen_kwargs.update(temperature=1.0, top_k=0, top_p=1.0)
 
         outputs = model.generate(input_ids, **gen_kwargs)
 
-    results = []
+    # generate() returns the samples for each prompt next to each other
+    results = [[] for _ in prompts]
     for i, output_ids in enumerate(outputs):
+        prompt = prompts[i // num_return_sequences]
         text = tokenizer.decode(output_ids, skip_special_tokens=True)
         # Remove the prompt from the generated text (keep prompt separate)
         if text.startswith(prompt):
@@ -86,21 +328,56 @@ def generate_story(
         else:
             # Fallback if tokenizer changes spacing
             cont = text
-        results.append(cont)
+        results[i // num_return_sequences].append(cont)
     return results
 
 
+def generate_story(
+    model: GPT2LMHeadModel,
+    tokenizer: GPT2TokenizerFast,
+    prompt: str,
+    max_new_tokens: int = 200,
+    temperature: float = 1.0,
+    top_k: int = 50,
+    top_p: float = 0.95,
+    num_return_sequences: int = 1,
+    device: torch.device = torch.device('cpu'),
+    fused_sampling: bool = False,
+) -> List[str]:
+    """Generate story continuations from a prompt.
+
+    Uses sampling with temperature, top-k, and top-p (nucleus) sampling for more
+    creative outputs. Returns a list of generated strings (one per sequence).
+    """
+    return generate_stories(
+        model,
+        tokenizer,
+        [prompt],
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        top_k=top_k,
+        top_p=top_p,
+        num_return_sequences=num_return_sequences,
+        device=device,
+        fused_sampling=fused_sampling,
+    )[0]
+
+
 def build_arg_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         description='Simple GPT-2 story generator (top-k / top-p sampling)'
     )
     p.add_argument('--prompt', '-p', type=str, default=None, help='Story prompt. If not provided, the script will ask interactively.')
-    p.add_argument('--max_length', '-m', type=int, default=200, help='Maximum total token length for generation (including prompt).')
+    p.add_argument('--batch_prompts', '-b', type=str, default=None, help='Text file with one prompt per line; all prompts are generated together in one batch.')
+    p.add_argument('--max_new_tokens', '--max_length', '-m', type=int, default=200, help='Maximum number of tokens to generate after the prompt.')
     p.add_argument('--temperature', '-t', type=float, default=1.0, help='Sampling temperature; higher = more random.')
     p.add_argument('--top_k', type=int, default=50, help='Top-k sampling parameter (0 to disable).')
     p.add_argument('--top_p', type=float, default=0.95, help='Top-p (nucleus) sampling parameter.')
     p.add_argument('--num_return_sequences', '-n', type=int, default=1, help='Number of stories to generate.')
     p.add_argument('--device', '-d', type=str, default=None, help='Device to use: cpu or cuda. Default: auto-detect.')
+    p.add_argument('--fused_sampling', action='store_true', help='On CUDA, sample with a fused FlashInfer top-k/top-p kernel (requires flashinfer).')
+    p.add_argument('--compile', action='store_true', help='Compile the model with torch.compile (slower start-up, faster generation).')
+    p.add_argument('--quantize', '-q', choices=QUANTIZE_CHOICES, default=None, help='Weight-only quantization: int8 (bitsandbytes on CUDA, dynamic int8 on CPU) or int4 (torchao, CUDA only).')
     return p
 
 
@@ -115,38 +392,51 @@ def main(argv: Optional[list[str]] = None):
         device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     print(f"Using device: {device}")
 
-    # Get prompt
-    prompt = args.prompt
-    if not prompt:
-        try:
-            prompt = input('Enter a story prompt: ').strip()
-        except EOFError:
-            print('\nNo prompt provided. Exiting.')
+    # Get prompt(s)
+    if args.batch_prompts:
+        with open(args.batch_prompts, encoding='utf-8') as f:
+            prompts = [line.strip() for line in f if line.strip()]
+        if not prompts:
+            print(f'No prompts found in {args.batch_prompts}, exiting.')
+            return
+    else:
+        prompt = args.prompt
+        if not prompt:
+            try:
+                prompt = input('Enter a story prompt: ').strip()
+            except EOFError:
+                print('\nNo prompt provided. Exiting.')
+                return
+        if not prompt:
+            print('Empty prompt, exiting.')
             return
-    if not prompt:
-        print('Empty prompt, exiting.')
-        return
+        prompts = [prompt]
 
-    model, tokenizer = load_model(device)
+    model, tokenizer = load_model(device, quantize=args.quantize, compile_model=args.compile)
+    torch.set_grad_enabled(False)  # Inference only from here on
 
     print('\nGenerating...\n')
-    stories = generate_story(
+    batches = generate_stories(
         model,
         tokenizer,
-        prompt,
-        max_length=args.max_length,
+        prompts,
+        max_new_tokens=args.max_new_tokens,
         temperature=args.temperature,
         top_k=args.top_k,
         top_p=args.top_p,
         num_return_sequences=args.num_return_sequences,
         device=device,
+        fused_sampling=args.fused_sampling,
     )
 
-    for i, s in enumerate(stories, start=1):
-        print('---')
-        print(f'Story #{i}:')
-        print(textwrap.fill(prompt + ' ' + s, width=80))
-        print('\n')
+    i = 0
+    for prompt, stories in zip(prompts, batches):
+        for s in stories:
+            i += 1
+            print('---')
+            print(f'Story #{i}:')
+            print(textwrap.fill(prompt + ' ' + s, width=80))
+            print('\n')
 
 
 if __name__ == '__main__':
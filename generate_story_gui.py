@@ -6,23 +6,265 @@ Story generator with local image generation using PIL
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-from transformers import pipeline, set_seed
-import torch
 import random
 import threading
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+import queue
+import traceback
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps, ImageTk
 import os
-import textwrap
 import io
+import functools
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+# torch and transformers take seconds to import, so they are imported inside
+# the functions that need them, which only run on background threads; the
+# window can open before either has loaded
+if TYPE_CHECKING:
+    import torch
+
+DEFAULT_MODEL = 'gpt2'
+
+# Fonts for the prompt image, loaded once at import instead of on every
+# generation. Fall back to PIL's default font if Arial is not installed.
+try:
+    _MAIN_FONT = ImageFont.truetype("arial.ttf", 36)
+    _SUB_FONT = ImageFont.truetype("arial.ttf", 24)
+except OSError:
+    _MAIN_FONT = _SUB_FONT = ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=32)
+def _subtitle_width(genre_text):
+    # The subtitle only varies with the genre, so measure each one once
+    left, _, right, _ = _SUB_FONT.getbbox(genre_text)
+    return right - left
+
+
+_BORDER_MARGIN = 20
+
+
+@functools.lru_cache(maxsize=4)
+def _render_background(size):
+    # The gradient and border do not depend on the prompt, so render them once
+    # per image size and paste the result into each new prompt image
+    # Nordic theme colors
+    color1 = (46, 52, 64)     # Nord dark
+    color2 = (94, 129, 172)   # Nord blue
+    color3 = (136, 192, 208)  # Nord light blue
+    
+    # Create multi-color gradient: stretch PIL's built-in vertical ramp over
+    # the image and colorize it through all three colors in one pass, so the
+    # RGB image is produced directly instead of pasted into a blank one
+    ramp = Image.linear_gradient('L').resize(size)
+    image = ImageOps.colorize(ramp, color1, color3, mid=color2)
+    
+    # Add some decorative elements
+    margin = _BORDER_MARGIN
+    # Draw border
+    ImageDraw.Draw(image).rectangle([margin, margin, size[0]-margin, size[1]-margin], 
+                                    outline=(236, 239, 244), width=2)  # Nord white
+    return image
+
+
+def _split_long_word(word, font, max_width):
+    # Break a word wider than max_width (e.g. a URL) at character boundaries
+    # into pieces that each fit on a line
+    pieces = []
+    piece = ""
+    for char in word:
+        if piece and font.getlength(piece + char) > max_width:
+            pieces.append(piece)
+            piece = char
+        else:
+            piece += char
+    pieces.append(piece)
+    return pieces
+
+
+def _wrap_to_width(text, font, max_width):
+    # Greedy word wrap measured in pixels with the font's own advance widths,
+    # so proportional fonts fill each line instead of guessing a char count
+    space = font.getlength(" ")
+    words = []
+    for word in text.split():
+        if font.getlength(word) > max_width:
+            words.extend(_split_long_word(word, font, max_width))
+        else:
+            words.append(word)
+    lines = []
+    line, width = "", 0
+    for word in words:
+        word_width = font.getlength(word)
+        if line and width + space + word_width > max_width:
+            lines.append(line)
+            line, width = word, word_width
+        elif line:
+            line, width = f"{line} {word}", width + space + word_width
+        else:
+            line, width = word, word_width
+    if line:
+        lines.append(line)
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=16)
+def _build_prompt_image(prompt, genre, size):
+    # Regenerating with the same prompt and genre gives the same picture, so
+    # keep the raw pixels of recent renders and skip the drawing on a repeat
+    image = _render_background(size).copy()
+    draw = ImageDraw.Draw(image)
+    margin = _BORDER_MARGIN
+    
+    main_font = _MAIN_FONT
+    sub_font = _SUB_FONT
+    
+    # Wrap text to fit comfortably inside the border
+    shadow_offset = 3
+    max_text_width = size[0] - 4 * margin - 2 * shadow_offset
+    wrapped_text = _wrap_to_width(prompt, main_font, max_text_width)
+    
+    # Get text size (leaving room for the shadow around the glyphs)
+    text_bbox = draw.multiline_textbbox((0, 0), wrapped_text, font=main_font,
+                                        stroke_width=shadow_offset)
+    text_width = text_bbox[2] - text_bbox[0]
+    text_height = text_bbox[3] - text_bbox[1]
+    
+    # Calculate position to center text, never starting left of the border
+    x = max(margin, (size[0] - text_width) // 2)
+    y = (size[1] - text_height) // 2
+    
+    # Draw text with improved visibility
+    outline_color = (236, 239, 244)  # Nord white
+    text_color = (229, 233, 240)     # Nord light
+    shadow_color = (46, 52, 64)      # Nord dark
+    
+    # Add a decorative subtitle with the current genre
+    genre_text = f"✨ A {genre} Tale ✨"
+    sub_width = _subtitle_width(genre_text)
+    sub_x = (size[0] - sub_width) // 2
+    sub_y = y + text_height + 20
+    
+    # Rasterize each line of text exactly once into an alpha mask; the same
+    # masks are used for the shadow and for the text itself
+    text_mask = Image.new('L', size, 0)
+    ImageDraw.Draw(text_mask).multiline_text((x, y), wrapped_text, font=main_font, fill=255)
+    sub_mask = Image.new('L', size, 0)
+    ImageDraw.Draw(sub_mask).text((sub_x, sub_y), genre_text, font=sub_font, fill=255)
+    
+    # Soft shadow for both lines of text: offset the masks (thickening the
+    # main text like a 2px stroke), blur, and composite the shadow color
+    shadow_mask = Image.new('L', size, 0)
+    shadow_mask.paste(text_mask.filter(ImageFilter.MaxFilter(5)), (2, 2))
+    shadow_mask.paste(255, (1, 1), sub_mask)
+    shadow_mask = shadow_mask.filter(ImageFilter.GaussianBlur(shadow_offset))
+    image.paste(shadow_color, (0, 0), shadow_mask)
+    
+    # Composite main text and subtitle on top of the shadow
+    image.paste(text_color, (0, 0), text_mask)
+    image.paste(outline_color, (0, 0), sub_mask)
+    
+    return image.tobytes()
+
+
+# Loaded (model, tokenizer) pairs keyed by (model_name, device, quantize),
+# shared by every window so the weights are only ever held in memory once
+_MODEL_CACHE = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def load_model_and_tokenizer(model_name: str = DEFAULT_MODEL, device: 'torch.device' = None,
+                             quantize: Optional[str] = 'int8'):
+    # Return the cached model if it is already loaded; holding the lock while
+    # loading makes concurrent callers wait for the first load to finish
+    import torch
+    if device is None:
+        device = torch.device('cpu')
+    key = (model_name, str(device), quantize)
+    with _MODEL_LOCK:
+        if key not in _MODEL_CACHE:
+            _MODEL_CACHE[key] = _load_model_and_tokenizer(model_name, device, quantize)
+        return _MODEL_CACHE[key]
+
+
+def _load_model_and_tokenizer(model_name, device, quantize):
+    # Loading is shared with the CLI; generate_story imports torch at the
+    # top, so it is imported here, on the loading thread
+    from generate_story import load_model
+    # quantize takes load_model's values ('int8', 'int4' or None). int8 on
+    # CUDA needs bitsandbytes; without it, fall back to half precision.
+    if quantize == 'int8' and device.type == 'cuda' and not importlib.util.find_spec('bitsandbytes'):
+        quantize = None
+    # Opt-in: compile the forward pass. CUDA graphs are not used, since they
+    # are tied to the recording thread and each story generates on a new one.
+    compile_model = (os.environ.get('USE_COMPILE') == '1' and device.type == 'cuda'
+                     and quantize is None)
+    try:
+        return load_model(device, quantize=quantize,
+                          compile_model=compile_model, model_name=model_name)
+    except Exception:
+        if not compile_model:
+            raise
+        # Compilation is unavailable here (e.g. no Triton); load uncompiled
+        return load_model(device, quantize=None, model_name=model_name)
+
+
+@functools.lru_cache(maxsize=64)
+def _encode_prompt(tokenizer, prompt):
+    # Regenerating from the same prompt (to get a different sample) is common,
+    # so keep recent encodings instead of re-running the tokenizer each click.
+    # The cached tensors are never modified; they are copied to the device.
+    return tokenizer(prompt, return_tensors='pt')
+
+
+def generate_text(model, tokenizer, prompt, max_new_tokens, temperature, top_k, top_p, device, streamer=None):
+    import torch
+    from generate_story import to_device
+    encoded = _encode_prompt(tokenizer, prompt)
+    input_ids = to_device(encoded['input_ids'], device)
+    attention_mask = encoded.get('attention_mask')
+    if attention_mask is not None:
+        attention_mask = to_device(attention_mask, device)
+    with torch.inference_mode():
+        outputs = model.generate(
+            input_ids,
+            do_sample=True,
+            max_new_tokens=max_new_tokens,
+            eos_token_id=tokenizer.eos_token_id,
+            temperature=temperature,
+            top_k=top_k if top_k > 0 else None,
+            top_p=top_p,
+            pad_token_id=tokenizer.eos_token_id,
+            attention_mask=attention_mask,
+            use_cache=True,
+            streamer=streamer,
+        )
+    text = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    # Return the continuation (strip prompt if present)
+    if text.startswith(prompt):
+        return text[len(prompt):].strip()
+    return text
+
 
 class StoryGeneratorGUI:
+    # ttk styles live in the Tk interpreter, so they only need registering
+    # once per root window rather than once per StoryGeneratorGUI
+    _styles_root = None
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Story Generator")
         
-        # Set up the story generator
-        self.generator = pipeline('text-generation', model='gpt2')
-        set_seed(42)  # For reproducibility
+        # Model (and torch itself) is loaded on a background thread once the
+        # window is up; the device is picked then
+        self.model = None
+        self.tokenizer = None
+        self.device = None
+        
+        # Prompt image and its Tk photo are reused across generations
+        self._prompt_image = None
+        self._photo = None
         
         # Configure main window
         self.root.geometry("1400x900")
@@ -41,7 +283,46 @@ class StoryGeneratorGUI:
         self.setup_styles()
         self.create_widgets()
         
+        # Worker threads post UI updates here; the Tk main loop applies them
+        self._ui_queue = queue.Queue()
+        self._last_progress = 0
+        self.root.after(50, self._drain_queue)
+        
+        # Start loading the model right away without blocking the window
+        self._generating = False
+        self.status_var.set("Loading model...")
+        threading.Thread(target=self._preload_model, daemon=True).start()
+        
+    def _preload_model(self):
+        # Runs on a background thread. The model cache lock makes a Generate
+        # click during loading wait for this load instead of starting another.
+        try:
+            self._load_model()
+        except Exception as e:
+            # Loading is retried on the first Generate click
+            self._post(self._on_preload_done, f"Error: {str(e)}")
+        else:
+            self._post(self._on_preload_done, "Ready to create your story...")
+        
+    def _load_model(self):
+        import torch
+        if self.device is None:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # int8 weights by default; USE_INT8=0 loads full-precision weights
+        quantize = None if os.environ.get('USE_INT8') == '0' else 'int8'
+        self.model, self.tokenizer = load_model_and_tokenizer(DEFAULT_MODEL, self.device, quantize)
+        
+    def _on_preload_done(self, message):
+        # Don't overwrite the status of a generation that is already running
+        if not self._generating:
+            self.status_var.set(message)
+        
     def setup_styles(self):
+        if StoryGeneratorGUI._styles_root is not self.root:
+            self._do_setup_styles()
+            StoryGeneratorGUI._styles_root = self.root
+        
+    def _do_setup_styles(self):
         # Configure styles for widgets using a modern dark theme
         style = ttk.Style()
         
@@ -188,6 +469,9 @@ class StoryGeneratorGUI:
             "Fairy Tale": "🏰"
         }
         genres = list(self.genre_icons.keys())
+        # Map each combobox label back to its plain genre name
+        self._genre_labels = {f"{icon} {g}": g for g, icon in self.genre_icons.items()}
+        self._genre_key = tk.StringVar(value="Fantasy")
         
         genre_frame = ttk.Frame(form_frame, style='Input.TFrame', padding=5)
         genre_frame.pack(fill='x', pady=(0, 15))
@@ -224,7 +508,9 @@ class StoryGeneratorGUI:
         }
         
         def update_genre_desc(*args):
-            genre = self.genre_var.get().split(" ")[-1]  # Remove icon if present
+            label = self.genre_var.get()
+            genre = self._genre_labels.get(label, label)  # Remove icon if present
+            self._genre_key.set(genre)
             self.genre_desc_var.set(self.genre_descriptions.get(genre, ""))
         
         self.genre_var.trace('w', update_genre_desc)
@@ -243,6 +529,8 @@ class StoryGeneratorGUI:
             "Long": "📚"
         }
         lengths = list(self.length_icons.keys())
+        self._length_labels = {f"{icon} {l}": l for l, icon in self.length_icons.items()}
+        self._length_key = tk.StringVar(value="Medium")
         
         length_frame = ttk.Frame(form_frame, style='Input.TFrame', padding=5)
         length_frame.pack(fill='x', pady=(0, 5))
@@ -306,7 +594,9 @@ class StoryGeneratorGUI:
         time_label.pack(side='right', padx=5)
         
         def update_length_desc(*args):
-            length = self.length_var.get().split(" ")[-1]  # Remove icon if present
+            label = self.length_var.get()
+            length = self._length_labels.get(label, label)  # Remove icon if present
+            self._length_key.set(length)
             info = self.length_desc.get(length, {"desc": "", "words": "", "time": ""})
             self.length_desc_var.set(info["desc"])
             self.length_words_var.set(info["words"])
@@ -457,10 +747,46 @@ class StoryGeneratorGUI:
         )
         self.story_text.grid(row=0, column=0, sticky='nsew')
         
+    def _drain_queue(self):
+        # Tk is not thread-safe, so every widget update requested by a worker
+        # thread is applied here, on the main thread
+        try:
+            while True:
+                kind, *payload = self._ui_queue.get_nowait()
+                if kind == 'progress':
+                    self._apply_progress(payload[0])
+                elif kind == 'status':
+                    self._apply_status(payload[0])
+                else:
+                    func, args = payload
+                    try:
+                        func(*args)
+                    except Exception:
+                        # One failed update must not stop the queue, or the
+                        # Generate button would never be re-enabled
+                        traceback.print_exc()
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(50, self._drain_queue)
+        
+    def _apply_progress(self, value):
+        # Skip redraws for changes of less than one percent
+        if abs(value - self._last_progress) >= 1:
+            self._last_progress = value
+            self.progress_var.set(value)
+            self.progress_text.set(f"{int(value)}%")
+        
+    def _apply_status(self, message):
+        if message != self.status_var.get():
+            self.status_var.set(message)
+        
+    def _post(self, func, *args):
+        # Run func(*args) on the Tk main thread
+        self._ui_queue.put(('call', func, args))
+        
     def update_progress(self, value):
-        self.progress_var.set(value)
-        self.progress_text.set(f"{int(value)}%")
-        self.root.update_idletasks()
+        self._ui_queue.put(('progress', value))
         
     def update_status(self, message):
         status_icons = {
@@ -478,147 +804,130 @@ class StoryGeneratorGUI:
                 icon = status_icons[key]
                 break
         
-        self.status_var.set(f"{message}")
-        self.root.update_idletasks()
+        self._ui_queue.put(('status', f"{message}"))
         
     def generate_story(self):
         # Disable the generate button
+        self._generating = True
         self.generate_btn.configure(state='disabled')
         self.update_status("Generating story...")
         self.update_progress(0)
         
+        # Read the inputs here; the worker thread must not touch Tk widgets
+        genre = self._genre_key.get()
+        length = self._length_key.get()
+        prompt = self.prompt_entry.get()
+        
         # Start generation in a separate thread
-        thread = threading.Thread(target=self._generate_story_thread)
+        thread = threading.Thread(target=self._generate_story_thread,
+                                  args=(genre, length, prompt))
         thread.daemon = True
         thread.start()
         
-    def _generate_story_thread(self):
+    def _generate_story_thread(self, genre, length, prompt):
         try:
             # Clear previous story
-            self.story_text.delete(1.0, tk.END)
-            self.root.update_idletasks()
-            
-            # Get input values and remove icons
-            genre = self.genre_var.get().split(" ")[-1]  # Remove icon
-            length = self.length_var.get().split(" ")[-1]  # Remove icon
-            prompt = self.prompt_entry.get()
+            self._post(self.story_text.delete, 1.0, tk.END)
             
-            # Determine max length based on selection
-            max_length = {"Short": 100, "Medium": 200, "Long": 300}[length]
+            # Determine how many tokens to generate based on selection
+            max_new_tokens = {"Short": 100, "Medium": 200, "Long": 300}[length]
             
             # Create story prompt
             story_prompt = f"Write a {genre} story about {prompt}. "
             
+            if self.model is None or self.tokenizer is None:
+                self.update_status("Loading model...")
+                self._load_model()
+            
             self.update_progress(20)
             self.update_status("Generating story text...")
             
-            # Generate the story with explicit truncation
-            story = self.generator(story_prompt, 
-                                max_length=max_length,
-                                num_return_sequences=1,
-                                temperature=0.7,
-                                truncation=True,
-                                pad_token_id=50256)[0]['generated_text']
-            
-            self.update_progress(60)
-            self.update_status("Creating story image...")
+            # Fresh seed per click so each Generate gives a different story
+            from transformers import set_seed
+            set_seed(random.randint(0, 2**31 - 1))
             
-            # Generate a simple image based on the prompt
-            image = self.create_prompt_image(prompt)
+            # The image only depends on the prompt, so render it on a helper
+            # thread while the model generates instead of afterwards
+            with ThreadPoolExecutor(max_workers=1) as image_pool:
+                image_future = image_pool.submit(self.create_prompt_image, prompt, genre)
+                story = self._stream_story(story_prompt, max_new_tokens)
+                
+                self.update_progress(60)
+                self.update_status("Creating story image...")
+                image = image_future.result()
             
             # Update the UI with the results
-            self.display_results(story, image)
+            self._post(self.display_results, story, image)
             
             self.update_progress(100)
             self.update_status("Story generated successfully!")
             
         except Exception as e:
             self.update_status(f"Error: {str(e)}")
-            messagebox.showerror("Error", str(e))
+            self._post(messagebox.showerror, "Error", str(e))
         finally:
             # Re-enable the generate button
-            self.generate_btn.configure(state='normal')
+            self._post(self._finish_generation)
+            
+    def _stream_story(self, story_prompt, max_new_tokens):
+        # Generate the story, streaming the text into the story box as
+        # tokens are produced; returns the full text including the prompt
+        from transformers import TextIteratorStreamer
+        
+        class CountingStreamer(TextIteratorStreamer):
+            # Counts the generated token ids generate() hands over, so the
+            # progress bar can follow the actual number of tokens
+            generated = 0
             
-    def create_prompt_image(self, prompt, size=(500, 400)):
+            def put(self, value):
+                if not (self.skip_prompt and self.next_tokens_are_prompt):
+                    self.generated += value.numel()
+                super().put(value)
+        
+        streamer = CountingStreamer(self.tokenizer,
+                                    skip_prompt=True,
+                                    skip_special_tokens=True)
+        errors = []
+        
+        def run_generator():
+            try:
+                generate_text(self.model, self.tokenizer, story_prompt,
+                              max_new_tokens=max_new_tokens,
+                              temperature=0.7,
+                              top_k=50,
+                              top_p=1.0,
+                              device=self.device,
+                              streamer=streamer)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()  # Unblock the reader below
+        
+        threading.Thread(target=run_generator, daemon=True).start()
+        
+        # Advance the progress bar from 20% to 60% as tokens arrive
+        chunks = [story_prompt]
+        self._post(self.story_text.insert, tk.END, story_prompt)
+        for chunk in streamer:
+            chunks.append(chunk)
+            self._post(self.story_text.insert, tk.END, chunk)
+            generated = min(streamer.generated, max_new_tokens)
+            self.update_progress(20 + 40 * generated // max_new_tokens)
+        if errors:
+            raise errors[0]
+        return "".join(chunks)
+        
+    def _finish_generation(self):
+        self._generating = False
+        self.generate_btn.configure(state='normal')
+            
+    def create_prompt_image(self, prompt, genre, size=(500, 400)):
         """Create a visually appealing image with the prompt text."""
-        # Create a new image with a gradient background
-        image = Image.new('RGB', size, color='white')
-        draw = ImageDraw.Draw(image)
-        
-        # Create a more sophisticated gradient background
-        def interpolate(color1, color2, t):
-            return tuple(int(a + (b - a) * t) for a, b in zip(color1, color2))
-        
-        # Nordic theme colors
-        color1 = (46, 52, 64)    # Nord dark
-        color2 = (94, 129, 172)  # Nord blue
-        color3 = (136, 192, 208) # Nord light blue
-        
-        # Create multi-color gradient
-        height = size[1]
-        for y in range(height):
-            if y < height/2:
-                t = y / (height/2)
-                color = interpolate(color1, color2, t)
-            else:
-                t = (y - height/2) / (height/2)
-                color = interpolate(color2, color3, t)
-            draw.line([(0, y), (size[0], y)], fill=color)
-        
-        # Add some decorative elements
-        margin = 20
-        # Draw border
-        draw.rectangle([margin, margin, size[0]-margin, size[1]-margin], 
-                      outline=(236, 239, 244), width=2)  # Nord white
-        
-        # Try to load a nicer font, fall back to default if not found
-        try:
-            main_font = ImageFont.truetype("arial.ttf", 36)
-            sub_font = ImageFont.truetype("arial.ttf", 24)
-        except:
-            main_font = ImageFont.load_default()
-            sub_font = ImageFont.load_default()
-        
-        # Wrap text with better width
-        wrapped_text = textwrap.fill(prompt, width=25)
-        
-        # Get text size
-        text_bbox = draw.textbbox((0, 0), wrapped_text, font=main_font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        
-        # Calculate position to center text
-        x = (size[0] - text_width) // 2
-        y = (size[1] - text_height) // 2
-        
-        # Draw text with improved visibility
-        outline_color = (236, 239, 244)  # Nord white
-        text_color = (229, 233, 240)     # Nord light
-        shadow_color = (46, 52, 64)      # Nord dark
-        
-        # Draw shadow
-        shadow_offset = 3
-        for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            draw.text((x + dx*shadow_offset, y + dy*shadow_offset), 
-                     wrapped_text, font=main_font, fill=shadow_color)
-        
-        # Draw main text
-        draw.text((x, y), wrapped_text, font=main_font, fill=text_color)
-        
-        # Add a decorative subtitle with the current genre
-        genre = self.genre_var.get().split(" ")[-1]  # Remove icon
-        genre_text = f"✨ A {genre} Tale ✨"
-        sub_bbox = draw.textbbox((0, 0), genre_text, font=sub_font)
-        sub_width = sub_bbox[2] - sub_bbox[0]
-        sub_x = (size[0] - sub_width) // 2
-        sub_y = y + text_height + 20
-        
-        # Draw subtitle with shadow
-        draw.text((sub_x + 1, sub_y + 1), genre_text, 
-                 font=sub_font, fill=shadow_color)
-        draw.text((sub_x, sub_y), genre_text, 
-                 font=sub_font, fill=outline_color)
-        
+        # Reuse one image buffer across generations and fill it with the
+        # cached rendering for this prompt
+        if self._prompt_image is None or self._prompt_image.size != size:
+            self._prompt_image = Image.new('RGB', size)
+        image = self._prompt_image
+        image.frombytes(_build_prompt_image(prompt, genre, size))
         return image
         
     def display_results(self, story, image):
@@ -626,13 +935,25 @@ class StoryGeneratorGUI:
         self.story_text.delete(1.0, tk.END)
         self.story_text.insert(1.0, story)
         
-        # Convert PIL image to PhotoImage and display
-        photo = ImageTk.PhotoImage(image)
-        self.image_label.configure(image=photo)
-        self.image_label.image = photo  # Keep a reference
+        # Shrink the image to the width available in the image frame (minus
+        # the label padding) before handing it to Tk. The label itself just
+        # takes the size of its current photo, so it can't be measured.
+        max_width = self.image_frame.winfo_width() - 40
+        if 1 < max_width < image.width:
+            height = max(1, image.height * max_width // image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        
+        # Copy the PIL image into the existing PhotoImage when the size still
+        # matches; only create (and display) a new one otherwise
+        if self._photo is not None and (self._photo.width(), self._photo.height()) == image.size:
+            self._photo.paste(image)
+        else:
+            self._photo = ImageTk.PhotoImage(image)
+            self.image_label.configure(image=self._photo)
+            self.image_label.image = self._photo  # Keep a reference
         
         # Update title
-        words = story.split()[:5]  # Take first 5 words for title
+        words = story.split(None, 5)[:5]  # Take first 5 words for title
         title = " ".join(words) + "..."
         self.title_var.set(title)
 
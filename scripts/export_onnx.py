@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Export GPT-2 to ONNX for use with ONNX Runtime.
+
+The exported model keeps past_key_values inputs/outputs so generation still
+uses the KV cache. Once exported, set USE_ORT=1 and both generate_story.py and
+generate_story_gui.py load the ONNX Runtime model instead of the PyTorch one.
+
+Usage (PowerShell):
+  pip install optimum[onnxruntime]        # or optimum[onnxruntime-gpu] for CUDA
+  python .\scripts\export_onnx.py
+  $env:USE_ORT = "1"; python .\generate_story.py --prompt "A mysterious door appeared in the forest"
+"""
+
+import argparse
+
+from optimum.onnxruntime import ORTModelForCausalLM
+from transformers import GPT2TokenizerFast
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description='Export GPT-2 to ONNX Runtime format')
+    p.add_argument('--model', type=str, default='gpt2', help='Hugging Face model to export.')
+    p.add_argument('--output', '-o', type=str, default='gpt2-ort', help='Directory to write the ONNX model to (matches ORT_MODEL_DIR).')
+    return p
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    print(f"Exporting '{args.model}' to ONNX... this may take a moment")
+    model = ORTModelForCausalLM.from_pretrained(args.model, export=True, use_cache=True)
+    model.save_pretrained(args.output)
+    # Save the tokenizer alongside so the directory is self-contained
+    GPT2TokenizerFast.from_pretrained(args.model).save_pretrained(args.output)
+    print(f'Saved ONNX model to {args.output}')
+
+
+if __name__ == '__main__':
+    main()